@@ -3,38 +3,36 @@ import os
 
 DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fraud_cases.db")
 
+INSERT_SQL = '''
+    INSERT INTO fraud_cases (
+        userName, securityIdentifier, cardEnding, case_status, 
+        transactionName, transactionTime, transactionCategory, 
+        transactionSource, transactionAmount, securityQuestion, 
+        securityAnswer, outcome_note
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
 def setup_db():
     if os.path.exists(DB_FILE):
         try:
             os.remove(DB_FILE)
+            # A leftover WAL would be replayed into the new database
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(DB_FILE + suffix):
+                    os.remove(DB_FILE + suffix)
             print(f"Removed existing {DB_FILE}")
         except PermissionError:
             print(f"Error: Could not remove {DB_FILE}. It might be in use.")
             return
 
     conn = sqlite3.connect(DB_FILE)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
     cursor = conn.cursor()
 
-    # Create table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS fraud_cases (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            userName TEXT NOT NULL,
-            securityIdentifier TEXT,
-            cardEnding TEXT,
-            case_status TEXT,
-            transactionName TEXT,
-            transactionTime TEXT,
-            transactionCategory TEXT,
-            transactionSource TEXT,
-            transactionAmount TEXT,
-            securityQuestion TEXT,
-            securityAnswer TEXT,
-            outcome_note TEXT
-        )
-    ''')
-
-    # Insert sample data
+    # Sample data
     sample_case = (
         "Ansh",
         "98765",
@@ -49,17 +47,35 @@ def setup_db():
         "Biryani",
         ""
     )
+    rows = [sample_case]
+
+    # Create table and insert sample data in a single transaction (one fsync)
+    with conn:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS fraud_cases (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                userName TEXT NOT NULL,
+                securityIdentifier TEXT,
+                cardEnding TEXT,
+                case_status TEXT,
+                transactionName TEXT,
+                transactionTime TEXT,
+                transactionCategory TEXT,
+                transactionSource TEXT,
+                transactionAmount TEXT,
+                securityQuestion TEXT,
+                securityAnswer TEXT,
+                outcome_note TEXT
+            )
+        ''')
+        # NOCASE to match the agent's case-insensitive userName lookup
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_fc_username ON fraud_cases(userName COLLATE NOCASE)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_fc_card ON fraud_cases(cardEnding)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_fc_status ON fraud_cases(case_status)")
 
-    cursor.execute('''
-        INSERT INTO fraud_cases (
-            userName, securityIdentifier, cardEnding, case_status, 
-            transactionName, transactionTime, transactionCategory, 
-            transactionSource, transactionAmount, securityQuestion, 
-            securityAnswer, outcome_note
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', sample_case)
+        cursor.executemany(INSERT_SQL, rows)
 
-    conn.commit()
     print(f"Database {DB_FILE} created and populated with sample data.")
     
     # Verify data
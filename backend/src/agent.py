@@ -36,15 +36,44 @@ COURSE_CONTENT = [
         "question": "What is the difference between a For loop and a While loop?"
     }
 ]
+COURSE_BY_ID = {item["id"]: item for item in COURSE_CONTENT}
 
 # Voice IDs (Murf Falcon)
 VOICE_LEARN = "en-US-matthew"
 VOICE_QUIZ = "en-US-alicia"
 VOICE_TEACH = "en-US-ken"
 
-def get_topic_summary():
-    topics = [f"- {item['id']}: {item['title']}" for item in COURSE_CONTENT]
-    return "\n".join(topics)
+TOPIC_SUMMARY = "\n".join(f"- {item['id']}: {item['title']}" for item in COURSE_CONTENT)
+
+# Per-mode voice and instruction template, filled with the topic's fields
+PERSONAS = {
+    "learn": {
+        "voice": VOICE_LEARN,
+        "name": "Matthew (Teacher)",
+        "tmpl": (
+            "ROLE: Professor Matthew. "
+            "TASK: Explain '{title}' using this summary: '{summary}'. "
+            "Keep it clear and simple."
+        ),
+    },
+    "quiz": {
+        "voice": VOICE_QUIZ,
+        "name": "Alicia (Examiner)",
+        "tmpl": (
+            "ROLE: Examiner Alicia. "
+            "TASK: Ask this question: '{question}'. Wait for answer. Grade it."
+        ),
+    },
+    "teach_back": {
+        "voice": VOICE_TEACH,
+        "name": "Ken (Student)",
+        "tmpl": (
+            "ROLE: Student Ken. "
+            "TASK: Say 'I don't understand {title}. Can you explain it?' "
+            "If they miss details from: '{summary}', ask follow-up questions."
+        ),
+    },
+}
 
 # --- 2. THE TOOLS (Context Class) ---
 class TutorTools(lk_llm.FunctionContext):
@@ -68,39 +97,18 @@ class TutorTools(lk_llm.FunctionContext):
         logger.info(f"🔄 Requesting switch to mode: {mode} for topic: {topic_id}")
 
         # Find topic
-        topic_data = next((item for item in COURSE_CONTENT if item["id"] == topic_id), None)
+        topic_data = COURSE_BY_ID.get(topic_id)
         if not topic_data:
             return "Topic not found. Ask user to pick 'variables' or 'loops'."
 
+        persona = PERSONAS.get(mode)
+        if not persona:
+            return "Mode not found. Ask user to pick 'learn', 'quiz', or 'teach_back'."
+
         # Update Voice and Instructions
-        system_update = ""
-        voice_name = "Unknown"
-
-        if mode == "learn":
-            self.tts.voice = VOICE_LEARN
-            voice_name = "Matthew (Teacher)"
-            system_update = (
-                f"ROLE: Professor Matthew. "
-                f"TASK: Explain '{topic_data['title']}' using this summary: '{topic_data['summary']}'. "
-                f"Keep it clear and simple."
-            )
-            
-        elif mode == "quiz":
-            self.tts.voice = VOICE_QUIZ
-            voice_name = "Alicia (Examiner)"
-            system_update = (
-                f"ROLE: Examiner Alicia. "
-                f"TASK: Ask this question: '{topic_data['question']}'. Wait for answer. Grade it."
-            )
-
-        elif mode == "teach_back":
-            self.tts.voice = VOICE_TEACH
-            voice_name = "Ken (Student)"
-            system_update = (
-                f"ROLE: Student Ken. "
-                f"TASK: Say 'I don't understand {topic_data['title']}. Can you explain it?' "
-                f"If they miss details from: '{topic_data['summary']}', ask follow-up questions."
-            )
+        self.tts.voice = persona["voice"]
+        voice_name = persona["name"]
+        system_update = persona["tmpl"].format(**topic_data)
 
         logger.info(f"✅ Switched Voice to: {voice_name}")
         
@@ -112,18 +120,26 @@ class TutorTools(lk_llm.FunctionContext):
         )
 
 # --- 3. STARTUP ---
+_VAD_SINGLETON = None
+
+def get_vad():
+    # Load the Silero model once per process and reuse it across sessions
+    global _VAD_SINGLETON
+    if _VAD_SINGLETON is None:
+        _VAD_SINGLETON = silero.VAD.load()
+    return _VAD_SINGLETON
+
 def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["vad"] = get_vad()
 
 async def entrypoint(ctx: JobContext):
     ctx.log_context_fields = {"room": ctx.room.name}
     
     # 1. Setup Instructions
-    topics_text = get_topic_summary()
     instructions = f"""
     You are an Active Recall Coach.
     AVAILABLE TOPICS:
-    {topics_text}
+    {TOPIC_SUMMARY}
 
     MODES:
     1. Learn (Professor Matthew explains)
@@ -148,8 +164,13 @@ async def entrypoint(ctx: JobContext):
 
     # 4. Build Pipeline
     agent = VoicePipelineAgent(
-        vad=ctx.proc.userdata.get("vad") or silero.VAD.load(),
-        stt=deepgram.STT(model="nova-3"),
+        vad=ctx.proc.userdata.get("vad") or get_vad(),
+        stt=deepgram.STT(
+            model="nova-3",
+            interim_results=True,
+            smart_format=False,
+            endpointing_ms=25,
+        ),
         llm=google.LLM(model="gemini-1.5-flash-002"),
         tts=murf_tts,
         noise_cancellation=noise_cancellation.BVC(),
@@ -1,5 +1,6 @@
 import logging
 import json
+import re
 from typing import Annotated, List
 
 from dotenv import load_dotenv
@@ -24,8 +25,14 @@ logger = logging.getLogger("agent")
 
 load_dotenv(".env.local")
 
+# Everything that is not a letter or digit (same set str.isalnum keeps)
+_UNSAFE_FILENAME_RE = re.compile(r"[\W_]+")
+
 # --- 1. Define the Order State Helper ---
 class OrderState:
+    __slots__ = ("data",)
+    REQUIRED = ("drinkType", "size", "milk", "name")
+
     def __init__(self):
         self.data = {
             "drinkType": None,
@@ -37,15 +44,15 @@ class OrderState:
 
     def is_complete(self):
         # Check if required fields are filled
-        return all(self.data[k] is not None for k in ["drinkType", "size", "milk", "name"])
+        return all(self.data[k] is not None for k in self.REQUIRED)
 
     def save_to_json(self):
         # Create a safe filename
-        safe_name = "".join(x for x in self.data['name'] if x.isalnum())
+        safe_name = _UNSAFE_FILENAME_RE.sub("", self.data['name'])
         filename = f"order_{safe_name}.json"
         
         with open(filename, "w") as f:
-            json.dump(self.data, f, indent=2)
+            json.dump(self.data, f, separators=(",", ":"))
         logger.info(f"Order saved to {filename}")
         return filename
 
@@ -81,14 +88,22 @@ class Assistant(Agent):
         Update the current order with details provided by the customer. 
         Call this whenever the user provides new information about their drink.
         """
-        if drink_type: self.order_state.data["drinkType"] = drink_type
-        if size: self.order_state.data["size"] = size
-        if milk: self.order_state.data["milk"] = milk
-        if name: self.order_state.data["name"] = name
-        if extra: self.order_state.data["extras"].append(extra)
-        
-        logger.info(f"Updated State: {self.order_state.data}")
-        return f"Order updated. Current state: {self.order_state.data}"
+        changed = {
+            k: v
+            for k, v in (("drinkType", drink_type), ("size", size), ("milk", milk), ("name", name))
+            if v
+        }
+        self.order_state.data.update(changed)
+        if extra:
+            self.order_state.data["extras"].append(extra)
+            changed["added_extra"] = extra
+
+        if not changed:
+            return "Nothing changed: no order details were provided."
+
+        logger.info("Updated State: %s", self.order_state.data)
+        # Only echo what changed; the model already has the rest in context
+        return f"Order updated: {changed}"
 
     @function_tool
     async def finalize_order(self, ctx: RunContext):
@@ -112,7 +127,12 @@ async def entrypoint(ctx: JobContext):
 
     session = AgentSession(
         # STT: Deepgram Nova-3
-        stt=deepgram.STT(model="nova-3"),
+        stt=deepgram.STT(
+            model="nova-3",
+            interim_results=True,
+            smart_format=False,
+            endpointing_ms=25,
+        ),
         
         # LLM: Google Gemini
         llm=google.LLM(
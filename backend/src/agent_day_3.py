@@ -2,14 +2,11 @@ import logging
 import json
 import os
 import asyncio
-from datetime import datetime
-from typing import Annotated, List
+import functools
+from datetime import date, datetime
+from typing import Annotated, List, Optional
 from dataclasses import dataclass, field
 
-print("\n" + "Wellness" * 20)
-print("Day 3 – Health & Wellness Voice Companion LOADED!")
-print("Wellness" * 20 + "\n")
-
 from dotenv import load_dotenv
 from pydantic import Field  # ← THIS WAS MISSING!
 
@@ -31,44 +28,65 @@ from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
 logger = logging.getLogger("wellness-agent")
+logger.setLevel(logging.INFO)
+
 load_dotenv(".env.local")
 
 # ======================================================
 # WELLNESS LOG PERSISTENCE
 # ======================================================
-WELLNESS_LOG_FILE = "wellness_log.json"
+WELLNESS_LOG_FILE = "wellness_log.jsonl"
 
-def load_wellness_history() -> List[dict]:
+def load_last_entry() -> Optional[dict]:
+    # Only the most recent check-in is needed at session start, so read the
+    # tail of the log instead of parsing the whole history
     if not os.path.exists(WELLNESS_LOG_FILE):
-        return []
+        return None
     try:
-        with open(WELLNESS_LOG_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(WELLNESS_LOG_FILE, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            chunk = 4096
+            while True:
+                start = max(0, size - chunk)
+                f.seek(start)
+                lines = f.read().splitlines()
+                if start > 0:
+                    lines = lines[1:]  # first line may be cut mid-record
+                for line in reversed(lines):
+                    if line.strip():
+                        return json.loads(line)
+                if start == 0:
+                    return None
+                chunk *= 2
     except Exception as e:
-        print(f"Could not load history: {e}")
-        return []
+        logger.error(f"Could not load last entry: {e}")
+        return None
+
+def _append_wellness_line(line: str):
+    # Append-only: each check-in writes a single line instead of rewriting the log
+    with open(WELLNESS_LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
 
-def save_wellness_entry(entry: dict):
-    history = load_wellness_history()
-    history.append(entry)
-    with open(WELLNESS_LOG_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=2, ensure_ascii=False)
-    print(f"\nWELLNESS ENTRY SAVED → {entry['date']}")
-    print(json.dumps(entry, indent=2))
+async def save_wellness_entry(entry: dict):
+    line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+    # Disk I/O runs in a worker thread so the audio pipeline's event loop never blocks
+    await asyncio.to_thread(_append_wellness_line, line)
+    logger.info("Wellness entry saved → %s: %s", entry["date"], line)
 
 # ======================================================
 # USERDATA & STATE
 # ======================================================
-@dataclass
+@dataclass(slots=True)
 class WellnessState:
     mood: str | None = None
     energy_level: str | None = None
     goals: List[str] = field(default_factory=list)
 
     def is_complete(self) -> bool:
-        return bool(self.mood and self.energy_level and self.goals)
+        return self.mood is not None and self.energy_level is not None and bool(self.goals)
 
-@dataclass
+@dataclass(slots=True)
 class Userdata:
     wellness: WellnessState = field(default_factory=WellnessState)
     session_start: datetime = field(default_factory=datetime.now)
@@ -84,7 +102,7 @@ async def record_mood(
     mood: Annotated[str, Field(description="How the user is feeling today (e.g. calm, stressed, happy, tired)")],
 ) -> str:
     ctx.userdata.wellness.mood = mood.strip()
-    print(f"MOOD → {mood}")
+    logger.info("Mood → %s", mood)
     return f"Thanks for sharing — you're feeling {mood.lower()} today."
 
 @function_tool
@@ -93,7 +111,7 @@ async def record_energy(
     energy: Annotated[str, Field(description="User's current energy level")],
 ) -> str:
     ctx.userdata.wellness.energy_level = energy.strip()
-    print(f"ENERGY → {energy}")
+    logger.info("Energy → %s", energy)
     return f"got it — energy feels {energy.lower()}."
 
 @function_tool
@@ -103,7 +121,7 @@ async def set_goals(
 ) -> str:
     cleaned = [g.strip() for g in goals if g.strip()]
     ctx.userdata.wellness.goals = cleaned
-    print(f"GOALS → {cleaned}")
+    logger.info("Goals → %s", cleaned)
     return f"perfect — today you're aiming to: {', '.join(cleaned) or 'take it easy'}."
 
 @function_tool
@@ -111,20 +129,21 @@ async def complete_checkin(ctx: RunContext[Userdata]) -> str:
     w = ctx.userdata.wellness
     if not w.is_complete():
         missing = []
-        if not w.mood: missing.append("mood")
-        if not w.energy_level: missing.append("energy")
+        if w.mood is None: missing.append("mood")
+        if w.energy_level is None: missing.append("energy")
         if not w.goals: missing.append("goals")
         return f"almost done — just need your {', '.join(missing)}."
 
+    now = datetime.now()
     entry = {
-        "date": datetime.now().strftime("%Y-%m-%d"),
-        "timestamp": datetime.now().isoformat(),
+        "date": now.strftime("%Y-%m-%d"),
+        "timestamp": now.isoformat(),
         "mood": w.mood,
         "energy": w.energy_level,
         "goals": w.goals,
         "summary": f"Feeling {w.mood.lower()} with {w.energy_level.lower()} energy."
     }
-    save_wellness_entry(entry)
+    await save_wellness_entry(entry)
 
     recap = (
         f"Here's your check-in for today:\n"
@@ -133,12 +152,17 @@ async def complete_checkin(ctx: RunContext[Userdata]) -> str:
         f"• Goals: {', '.join(w.goals)}\n\n"
         f"You've got this! See you tomorrow"
     )
-    print("\nCHECK-IN COMPLETE & SAVED!")
+    logger.info("Check-in complete & saved")
     return recap
 
 # ======================================================
 # AGENT
 # ======================================================
+@functools.lru_cache(maxsize=1)
+def format_day(day: date) -> str:
+    # Keyed by date so the string is rebuilt only when the day rolls over
+    return day.strftime("%A, %B %d, %Y")
+
 class WellnessCompanion(Agent):
     def __init__(self, memory_line: str = ""):
         instructions = f"""
@@ -155,7 +179,7 @@ Flow for every short session (2–4 min):
 6. Recap and confirm
 7. Call complete_checkin when ready
 
-Be encouraging, gentle, and human. Use light emojis. Today is {datetime.now().strftime("%A, %B %d, %Y")}.
+Be encouraging, gentle, and human. Use light emojis. Today is {format_day(date.today())}.
 """
         super().__init__(
             instructions=instructions,
@@ -166,27 +190,35 @@ Be encouraging, gentle, and human. Use light emojis. Today is {datetime.now().st
 # PREWARM
 # ======================================================
 def prewarm(proc: JobProcess):
-    print("Prewarming Silero VAD...")
+    logger.info("Prewarming Silero VAD...")
     proc.userdata["vad"] = silero.VAD.load()
 
 # ======================================================
 # ENTRYPOINT
 # ======================================================
 async def entrypoint(ctx: JobContext):
-    print("\nSTARTING DAY 3 WELLNESS COMPANION")
+    logger.info("Starting Day 3 wellness companion")
+
+    # Connect to the room while the past check-in is read from disk
+    _, last = await asyncio.gather(
+        ctx.connect(auto_subscribe=True),
+        asyncio.to_thread(load_last_entry),
+    )
 
-    # Load past check-in for memory
-    history = load_wellness_history()
     memory_line = ""
-    if history:
-        last = history[-1]
+    if last:
         last_date = datetime.strptime(last["date"], "%Y-%m-%d").strftime("%A")
         memory_line = f"Last time on {last_date}, you were feeling {last['mood'].lower()}. How does today compare?"
 
     userdata = Userdata(memory_line=memory_line)
 
     session = AgentSession(
-        stt=deepgram.STT(model="nova-3"),
+        stt=deepgram.STT(
+            model="nova-3",
+            interim_results=True,
+            smart_format=False,
+            endpointing_ms=25,
+        ),
         llm=google.LLM(model="gemini-2.5-flash"),
         tts=murf.TTS(
             voice="en-US-matthew",
@@ -204,21 +236,15 @@ async def entrypoint(ctx: JobContext):
         room_input_options=RoomInputOptions(noise_cancellation=noise_cancellation.BVC()),
     )
 
-    await ctx.connect(auto_subscribe=True)
-
     greeting = "Hey there, it's your daily wellness check-in. How are you feeling today?"
     if memory_line:
         greeting = f"Hey again! {memory_line} How are you feeling today?"
 
-    await asyncio.sleep(1)
+    await ctx.wait_for_participant()
     await session.say(greeting, allow_interruptions=True)
 
 # ======================================================
 # LAUNCH
 # ======================================================
 if __name__ == "__main__":
-    print("\nLaunching Day 3 – Health & Wellness Voice Companion")
-    print("Powered by Murf Falcon – the FASTEST TTS API")
-    print("Wellness" * 30 + "\n")
-
     cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
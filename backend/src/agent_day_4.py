@@ -1,7 +1,7 @@
 import logging
 import json
-import os
-import asyncio
+import functools
+from pathlib import Path
 from typing import Annotated, List, Literal
 from dataclasses import dataclass, field
 
@@ -30,25 +30,63 @@ load_dotenv(".env.local")
 # ======================================================
 # CONTENT LOADING
 # ======================================================
-CONTENT_FILE = "../day4_tutor_content.json"
+CONTENT_FILE = Path(__file__).resolve().parent.parent / "day4_tutor_content.json"
 
+@functools.lru_cache(maxsize=1)
 def load_content():
     try:
-        # Adjust path if running from src or backend
-        path = CONTENT_FILE
-        if not os.path.exists(path):
-            path = "backend/day4_tutor_content.json"
-        if not os.path.exists(path):
-             path = "day4_tutor_content.json"
-        
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return json.loads(CONTENT_FILE.read_bytes())
     except Exception as e:
         logger.error(f"Could not load content: {e}")
         return []
 
 CONCEPTS = load_content()
 
+# Persona prompts depend only on static content, so build them all once
+TOPIC_LIST_STR = ", ".join(c['title'] for c in CONCEPTS)
+
+CONCEPT_TITLES_LC = tuple((c['title'].lower(), i) for i, c in enumerate(CONCEPTS))
+# reversed() so the first concept wins if two share a title
+CONCEPT_INDEX_BY_TITLE = dict(reversed(CONCEPT_TITLES_LC))
+
+VOICE_BY_MODE = {
+    "selection": "en-US-matthew",
+    "learn": "en-US-matthew",
+    "quiz": "en-US-alicia",
+    "teach_back": "en-US-ken",
+}
+
+SELECTION_INSTRUCTIONS = f"You are a helpful tutor. List the available topics: {TOPIC_LIST_STR}. Ask the user which one they want to learn about."
+
+def _persona_instructions(mode, concept):
+    if mode == "learn":
+        return f"""
+            You are Matthew, a helpful tutor.
+            Explain the concept: {concept['title']}.
+            Summary: {concept['summary']}.
+            If user wants to quiz or teach back, call the switch tools.
+        """
+    if mode == "quiz":
+        return f"""
+            You are Alicia, a quiz master.
+            Ask about: {concept['title']}.
+            Question: {concept['sample_question']}.
+            Evaluate answer.
+            If user wants to learn or teach back, call the switch tools.
+        """
+    return f"""
+            You are Ken, a curious student.
+            Ask user to explain: {concept['title']}.
+            Listen and give feedback based on: {concept['summary']}.
+            If user wants to learn or quiz, call the switch tools.
+        """
+
+PRECOMPUTED_INSTRUCTIONS = {
+    (mode, i): _persona_instructions(mode, c)
+    for i, c in enumerate(CONCEPTS)
+    for mode in ("learn", "quiz", "teach_back")
+}
+
 # ======================================================
 # SHARED STATE
 # ======================================================
@@ -72,41 +110,12 @@ def update_persona(state: TutorState):
     if not state.session or not state.agent:
         return
 
-    concept = state.current_concept
     mode = state.mode
-    
+    state.session.tts.voice = VOICE_BY_MODE[mode]
     if mode == "selection":
-        topic_list = ", ".join([c['title'] for c in CONCEPTS])
-        instructions = f"You are a helpful tutor. List the available topics: {topic_list}. Ask the user which one they want to learn about."
-        state.session.tts.voice = "en-US-matthew"
-
-    elif mode == "learn":
-        instructions = f"""
-            You are Matthew, a helpful tutor.
-            Explain the concept: {concept['title']}.
-            Summary: {concept['summary']}.
-            If user wants to quiz or teach back, call the switch tools.
-        """
-        state.session.tts.voice = "en-US-matthew"
-        
-    elif mode == "quiz":
-        instructions = f"""
-            You are Alicia, a quiz master.
-            Ask about: {concept['title']}.
-            Question: {concept['sample_question']}.
-            Evaluate answer.
-            If user wants to learn or teach back, call the switch tools.
-        """
-        state.session.tts.voice = "en-US-alicia"
-        
-    elif mode == "teach_back":
-        instructions = f"""
-            You are Ken, a curious student.
-            Ask user to explain: {concept['title']}.
-            Listen and give feedback based on: {concept['summary']}.
-            If user wants to learn or quiz, call the switch tools.
-        """
-        state.session.tts.voice = "en-US-ken"
+        instructions = SELECTION_INSTRUCTIONS
+    else:
+        instructions = PRECOMPUTED_INSTRUCTIONS[(mode, state.current_concept_index)]
 
     # Update agent instructions
     # Since we can't set instructions directly on base Agent easily if it's read-only,
@@ -139,12 +148,11 @@ async def select_topic(
     ctx: RunContext[TutorState],
     topic_name: Annotated[str, Field(description="The name of the topic to select (e.g. Variables, Loops)")]
 ) -> str:
-    # Find topic index
-    found_index = -1
-    for i, concept in enumerate(CONCEPTS):
-        if concept['title'].lower() in topic_name.lower():
-            found_index = i
-            break
+    # Find topic index: exact title first, then the first title mentioned in the request
+    key = topic_name.lower()
+    found_index = CONCEPT_INDEX_BY_TITLE.get(key)
+    if found_index is None:
+        found_index = next((i for title, i in CONCEPT_TITLES_LC if title in key), -1)
     
     if found_index == -1:
         return "Topic not found. Please ask the user to choose from the available topics."
@@ -179,12 +187,12 @@ async def entrypoint(ctx: JobContext):
     
     state = TutorState()
     
-    # We need to initialize TTS with a default, but it will be updated.
-    tts = murf.TTS(voice="en-US-matthew", style="Conversational", speed=1.0)
+    # TTS starts on the default voice; update_persona switches it per mode.
+    tts = ctx.proc.userdata["tts"]
     
     session = AgentSession(
-        stt=deepgram.STT(model="nova-3"),
-        llm=google.LLM(model="gemini-2.5-flash"),
+        stt=ctx.proc.userdata["stt"],
+        llm=ctx.proc.userdata["llm"],
         tts=tts,
         turn_detection=MultilingualModel(),
         vad=ctx.proc.userdata["vad"],
@@ -209,14 +217,23 @@ async def entrypoint(ctx: JobContext):
 
     await ctx.connect(auto_subscribe=True)
 
-    await asyncio.sleep(1)
-    await session.say(f"Hello! I am your active recall coach. Please choose a topic to start: {', '.join([c['title'] for c in CONCEPTS])}.", allow_interruptions=True)
+    await ctx.wait_for_participant()
+    await session.say(f"Hello! I am your active recall coach. Please choose a topic to start: {TOPIC_LIST_STR}.", allow_interruptions=True)
 
 # ======================================================
 # PREWARM & LAUNCH
 # ======================================================
 def prewarm(proc: JobProcess):
     proc.userdata["vad"] = silero.VAD.load()
+    # Plugins are built once per process; the turn detector needs the job context
+    proc.userdata["stt"] = deepgram.STT(
+        model="nova-3",
+        interim_results=True,
+        smart_format=False,
+        endpointing_ms=25,
+    )
+    proc.userdata["llm"] = google.LLM(model="gemini-2.5-flash")
+    proc.userdata["tts"] = murf.TTS(voice="en-US-matthew", style="Conversational", speed=1.0)
 
 if __name__ == "__main__":
     cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
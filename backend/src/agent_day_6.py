@@ -2,6 +2,8 @@ import os
 import logging
 import sqlite3
 import asyncio
+import threading
+import time
 from typing import Annotated
 
 from dotenv import load_dotenv
@@ -24,6 +26,9 @@ load_dotenv(".env.local")
 logger = logging.getLogger("fraud-agent")
 logger.setLevel(logging.INFO)
 
+# Seconds a case read from SQLite is served from memory
+CACHE_TTL = 30.0
+
 DB_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fraud_cases.db")
 
 class FraudDB:
@@ -34,59 +39,60 @@ class FraudDB:
             print("DEBUG: DB file exists.")
         else:
             print("DEBUG: DB FILE DOES NOT EXIST AT THIS PATH!")
+        self._conn = None
+        self._conn_fd = None
+        # One connection is shared by every tool call; sqlite3 connections are not
+        # safe for concurrent use, so access is serialized
+        self._lock = threading.Lock()
+        # Short-lived read cache so repeated tool calls in a session skip SQLite
+        self._active_cache = None
+        self._active_cache_ts = 0.0
+
+    def get_conn(self):
+        # Open the connection lazily (the DB may not exist yet at import time)
+        # and reuse it for every tool call. setup_fraud_db.py resets the DB by
+        # deleting and recreating the file; a descriptor held on the file we
+        # opened sees its link count drop to 0, and then we reconnect
+        if self._conn is not None and os.fstat(self._conn_fd).st_nlink == 0:
+            self._conn.close()
+            os.close(self._conn_fd)
+            self._conn = None
+            self._active_cache = None
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            # WAL and the indexes are set up by setup_fraud_db.py
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn = conn
+            self._conn_fd = os.open(self.db_path, os.O_RDONLY)
+        return self._conn
 
     def get_case_by_username(self, username):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM fraud_cases WHERE userName = ? COLLATE NOCASE", (username,))
-        row = cursor.fetchone()
-        conn.close()
-        if row:
-            return {
-                "id": row[0],
-                "userName": row[1],
-                "securityIdentifier": row[2],
-                "cardEnding": row[3],
-                "case_status": row[4],
-                "transactionName": row[5],
-                "transactionTime": row[6],
-                "transactionCategory": row[7],
-                "transactionSource": row[8],
-                "transactionAmount": row[9],
-                "securityQuestion": row[10],
-                "securityAnswer": row[11],
-                "outcome_note": row[12]
-            }
-        return None
+        with self._lock:
+            row = self.get_conn().execute(
+                "SELECT * FROM fraud_cases WHERE userName = ? COLLATE NOCASE", (username,)
+            ).fetchone()
+        return dict(row) if row else None
 
     def get_active_case(self):
         try:
             print(f"DEBUG: Attempting to connect to {self.db_path}")
             if not os.path.exists(self.db_path):
                 return None, f"DB file not found at {self.db_path}"
-                
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM fraud_cases ORDER BY id DESC LIMIT 1")
-            row = cursor.fetchone()
-            conn.close()
-            if row:
-                print(f"DEBUG: Found case: {row}")
-                return {
-                    "id": row[0],
-                    "userName": row[1],
-                    "securityIdentifier": row[2],
-                    "cardEnding": row[3],
-                    "case_status": row[4],
-                    "transactionName": row[5],
-                    "transactionTime": row[6],
-                    "transactionCategory": row[7],
-                    "transactionSource": row[8],
-                    "transactionAmount": row[9],
-                    "securityQuestion": row[10],
-                    "securityAnswer": row[11],
-                    "outcome_note": row[12]
-                }, None
+
+            with self._lock:
+                # get_conn() first: it drops the cache if the DB file was replaced
+                conn = self.get_conn()
+                if self._active_cache is not None and time.monotonic() - self._active_cache_ts < CACHE_TTL:
+                    return self._active_cache, None
+                row = conn.execute("SELECT * FROM fraud_cases ORDER BY id DESC LIMIT 1").fetchone()
+                case = dict(row) if row else None
+                if case:
+                    self._active_cache = case
+                    self._active_cache_ts = time.monotonic()
+            if case:
+                print(f"DEBUG: Found case: {case}")
+                return case, None
             print("DEBUG: No rows found in fraud_cases table.")
             return None, "No rows found in table"
         except Exception as e:
@@ -94,11 +100,11 @@ class FraudDB:
             return None, str(e)
 
     def update_case_status(self, case_id, status, note):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("UPDATE fraud_cases SET case_status = ?, outcome_note = ? WHERE id = ?", (status, note, case_id))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self.get_conn().execute(
+                "UPDATE fraud_cases SET case_status = ?, outcome_note = ? WHERE id = ?", (status, note, case_id)
+            )
+            self._active_cache = None
 
 db = FraudDB(DB_FILE)
 
@@ -106,7 +112,7 @@ db = FraudDB(DB_FILE)
 async def get_active_fraud_case() -> str:
     """Retrieve the most recent fraud case to investigate."""
     print("DEBUG: get_active_fraud_case TOOL CALLED!")
-    case, error = db.get_active_case()
+    case, error = await asyncio.to_thread(db.get_active_case)
     if case:
         return f"Found active case: {case}"
     return f"Error retrieving case: {error}. Path used: {db.db_path}"
@@ -119,7 +125,7 @@ async def update_case_status(
 ) -> str:
     """Update the status of the fraud case in the database."""
     logger.info(f"Updating case {case_id} to {status}: {note}")
-    db.update_case_status(case_id, status, note)
+    await asyncio.to_thread(db.update_case_status, case_id, status, note)
     return "Case updated successfully."
 
 class FraudAgent(Agent):
@@ -139,18 +145,22 @@ class FraudAgent(Agent):
 
 def prewarm(proc: JobProcess):
     proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["stt"] = deepgram.STT(
+        model="nova-3",
+        interim_results=True,
+        smart_format=False,
+        endpointing_ms=25,
+    )
+    proc.userdata["llm"] = google.LLM(model="gemini-2.5-flash")
+    proc.userdata["tts"] = deepgram.TTS()
 
 async def entrypoint(ctx: JobContext):
     logger.info(f"connecting to room {ctx.room.name}")
 
-    # tts = murf.TTS(voice="en-US-matthew", style="Conversational", speed=1.0)
-    # tts = google.TTS()
-    tts = deepgram.TTS()
-
     session = AgentSession(
-        stt=deepgram.STT(model="nova-3"),
-        llm=google.LLM(model="gemini-2.5-flash"),
-        tts=tts,
+        stt=ctx.proc.userdata["stt"],
+        llm=ctx.proc.userdata["llm"],
+        tts=ctx.proc.userdata["tts"],
         turn_detection=MultilingualModel(),
         vad=ctx.proc.userdata["vad"],
     )
@@ -161,7 +171,7 @@ async def entrypoint(ctx: JobContext):
     await ctx.connect(auto_subscribe=True)
 
     async def greet():
-        await asyncio.sleep(1)
+        await ctx.wait_for_participant()
         await session.say("Hello, this is the Fraud Department at Murf Bank. I'm calling about some suspicious activity on your account.", allow_interruptions=True)
 
     # Greet immediately
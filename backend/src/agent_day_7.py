@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import time
@@ -24,6 +25,16 @@ load_dotenv(".env.local")
 logger = logging.getLogger("grocery-agent")
 logger.setLevel(logging.INFO)
 
+def build_substring_index(mapping):
+    # Map every substring of each key to the value of the first key containing it,
+    # so an `item_key in name` scan over the whole map becomes one dict lookup
+    index = {}
+    for name, value in mapping.items():
+        for start in range(len(name)):
+            for end in range(start + 1, len(name) + 1):
+                index.setdefault(name[start:end], value)
+    return index
+
 # Load Catalog
 CATALOG_PATH = "grocery_catalog.json"
 try:
@@ -39,72 +50,104 @@ try:
         PRODUCTS = {p["id"]: p for p in CATALOG_DATA["products"]}
         # Create a name to ID mapping for easier lookup
         PRODUCT_NAME_MAP = {p["name"].lower(): p["id"] for p in CATALOG_DATA["products"]}
+        PRODUCT_SUBSTRING_INDEX = build_substring_index(PRODUCT_NAME_MAP)
         RECIPES = CATALOG_DATA.get("recipes", {})
+        RECIPES_LC = {name.lower(): items for name, items in RECIPES.items()}
+        RECIPE_SUBSTRING_INDEX = build_substring_index(RECIPES_LC)
     logger.info(f"Loaded catalog from {CATALOG_PATH}")
 except Exception as e:
     logger.error(f"Failed to load catalog: {e}")
     PRODUCTS = {}
     PRODUCT_NAME_MAP = {}
+    PRODUCT_SUBSTRING_INDEX = {}
     RECIPES = {}
+    RECIPES_LC = {}
+    RECIPE_SUBSTRING_INDEX = {}
+
+def resolve_product(item_key: str) -> Optional[str]:
+    """Return the product id for an exact or partial (lowercase) product name."""
+    return PRODUCT_NAME_MAP.get(item_key) or PRODUCT_SUBSTRING_INDEX.get(item_key)
+
+def _write_order_sync(path: str, data: dict):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def _unit_price(product_id: str) -> float:
+    product = PRODUCTS.get(product_id)
+    return product["price"] if product else 0.0
 
 class Cart:
     def __init__(self):
         self.items: Dict[str, int] = {} # product_id -> quantity
+        # Running total kept in step with items; to_dict result cached until the next mutation
+        self._total = 0.0
+        self._cached_dict = None
 
     def add(self, product_id: str, quantity: int = 1):
-        if product_id in self.items:
-            self.items[product_id] += quantity
-        else:
-            self.items[product_id] = quantity
+        self.items[product_id] = self.items.get(product_id, 0) + quantity
+        self._total += _unit_price(product_id) * quantity
+        self._cached_dict = None
 
     def remove(self, product_id: str):
-        if product_id in self.items:
-            del self.items[product_id]
+        quantity = self.items.pop(product_id, None)
+        if quantity is not None:
+            self._total -= _unit_price(product_id) * quantity
+            self._cached_dict = None
 
     def update(self, product_id: str, quantity: int):
         if quantity <= 0:
             self.remove(product_id)
         else:
+            previous = self.items.get(product_id, 0)
             self.items[product_id] = quantity
+            self._total += _unit_price(product_id) * (quantity - previous)
+            self._cached_dict = None
 
     def clear(self):
         self.items = {}
+        self._total = 0.0
+        self._cached_dict = None
+
+    @property
+    def total(self) -> float:
+        # Rounded to paise so incremental float updates don't leak drift
+        return round(self._total, 2)
 
     def get_summary(self) -> str:
         if not self.items:
             return "Your cart is empty."
-        
+
         summary_lines = []
-        total_price = 0.0
-        
         for pid, qty in self.items.items():
             product = PRODUCTS.get(pid)
             if product:
-                line_total = product["price"] * qty
-                total_price += line_total
-                summary_lines.append(f"- {qty} {product['unit']}(s) of {product['name']} (₹{line_total:.2f})")
-        
-        summary_lines.append(f"Total: ₹{total_price:.2f}")
+                summary_lines.append(f"- {qty} {product['unit']}(s) of {product['name']} (₹{product['price'] * qty:.2f})")
+        summary_lines.append(f"Total: ₹{self.total:.2f}")
         return "\n".join(summary_lines)
 
     def to_dict(self):
-        return {
-            "items": [
-                {
-                    "product_id": pid,
-                    "name": PRODUCTS[pid]["name"],
-                    "quantity": qty,
-                    "price": PRODUCTS[pid]["price"],
-                    "total": PRODUCTS[pid]["price"] * qty
-                }
-                for pid, qty in self.items.items() if pid in PRODUCTS
-            ],
-            "total": sum(PRODUCTS[pid]["price"] * qty for pid, qty in self.items.items() if pid in PRODUCTS)
-        }
+        if self._cached_dict is None:
+            items = []
+            for pid, qty in self.items.items():
+                product = PRODUCTS.get(pid)
+                if product:
+                    price = product["price"]
+                    items.append({
+                        "product_id": pid,
+                        "name": product["name"],
+                        "quantity": qty,
+                        "price": price,
+                        "total": price * qty
+                    })
+            self._cached_dict = {"items": items, "total": self.total}
+        return self._cached_dict
 
 class GroceryAgent(Agent):
     def __init__(self):
         self.cart = Cart()
+        # The session runs tool calls from one LLM turn concurrently; place_order
+        # awaits the file write mid-update, so cart changes are serialized
+        self._cart_lock = asyncio.Lock()
         
         # Create a dynamic system prompt with available recipes
         recipe_list = ", ".join(RECIPES.keys())
@@ -129,17 +172,11 @@ class GroceryAgent(Agent):
     ):
         """Add an item to the cart."""
         logger.info(f"Adding to cart: {item_name}, qty: {quantity}")
-        item_key = item_name.lower()
-        product_id = PRODUCT_NAME_MAP.get(item_key)
-        
-        if not product_id:
-            for name, pid in PRODUCT_NAME_MAP.items():
-                if item_key in name:
-                    product_id = pid
-                    break
+        product_id = resolve_product(item_name.lower())
         
         if product_id:
-            self.cart.add(product_id, quantity)
+            async with self._cart_lock:
+                self.cart.add(product_id, quantity)
             product_name = PRODUCTS[product_id]["name"]
             return f"Added {quantity} {PRODUCTS[product_id]['unit']}(s) of {product_name} to your cart."
         else:
@@ -153,21 +190,15 @@ class GroceryAgent(Agent):
     ):
         """Remove an item from the cart."""
         logger.info(f"Removing from cart: {item_name}")
-        item_key = item_name.lower()
-        product_id = PRODUCT_NAME_MAP.get(item_key)
-        
-        if not product_id:
-             for name, pid in PRODUCT_NAME_MAP.items():
-                if item_key in name:
-                    product_id = pid
-                    break
+        product_id = resolve_product(item_name.lower())
         
         if product_id:
-            if product_id in self.cart.items:
-                self.cart.remove(product_id)
-                return f"Removed {PRODUCTS[product_id]['name']} from your cart."
-            else:
-                return f"{PRODUCTS[product_id]['name']} is not in your cart."
+            async with self._cart_lock:
+                if product_id in self.cart.items:
+                    self.cart.remove(product_id)
+                    return f"Removed {PRODUCTS[product_id]['name']} from your cart."
+                else:
+                    return f"{PRODUCTS[product_id]['name']} is not in your cart."
         else:
             return f"Sorry, I couldn't find {item_name} to remove."
 
@@ -180,17 +211,11 @@ class GroceryAgent(Agent):
     ):
         """Update the quantity of an item in the cart."""
         logger.info(f"Updating quantity: {item_name} to {quantity}")
-        item_key = item_name.lower()
-        product_id = PRODUCT_NAME_MAP.get(item_key)
-        
-        if not product_id:
-             for name, pid in PRODUCT_NAME_MAP.items():
-                if item_key in name:
-                    product_id = pid
-                    break
+        product_id = resolve_product(item_name.lower())
 
         if product_id:
-            self.cart.update(product_id, quantity)
+            async with self._cart_lock:
+                self.cart.update(product_id, quantity)
             return f"Updated {PRODUCTS[product_id]['name']} quantity to {quantity}."
         else:
             return f"Sorry, I couldn't find {item_name}."
@@ -211,19 +236,14 @@ class GroceryAgent(Agent):
         logger.info(f"Adding ingredients for recipe: {recipe_name}")
         recipe_key = recipe_name.lower()
         
-        ingredients = RECIPES.get(recipe_key)
-        
-        if not ingredients:
-            for name, items in RECIPES.items():
-                if recipe_key in name:
-                    ingredients = items
-                    break
+        ingredients = RECIPES_LC.get(recipe_key) or RECIPE_SUBSTRING_INDEX.get(recipe_key)
         
         if ingredients:
             added_items = []
-            for pid in ingredients:
-                self.cart.add(pid, 1)
-                added_items.append(PRODUCTS[pid]["name"])
+            async with self._cart_lock:
+                for pid in ingredients:
+                    self.cart.add(pid, 1)
+                    added_items.append(PRODUCTS[pid]["name"])
             return f"Added ingredients for {recipe_name}: {', '.join(added_items)}."
         else:
             return f"Sorry, I don't have a recipe for {recipe_name}."
@@ -232,31 +252,39 @@ class GroceryAgent(Agent):
     async def place_order(self, context: RunContext):
         """Place the order and save it."""
         logger.info("Placing order")
-        if not self.cart.items:
-            return "Your cart is empty. Please add items before placing an order."
+        async with self._cart_lock:
+            if not self.cart.items:
+                return "Your cart is empty. Please add items before placing an order."
         
-        order_data = {
-            "timestamp": time.time(),
-            "order_date": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "cart": self.cart.to_dict(),
-            "status": "placed"
-        }
+            order_data = {
+                "timestamp": time.time(),
+                "order_date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "cart": self.cart.to_dict(),
+                "status": "placed"
+            }
         
-        filename = f"order_{int(time.time())}.json"
-        try:
-            with open(filename, "w") as f:
-                json.dump(order_data, f, indent=2)
-            
-            summary = self.cart.get_summary()
-            self.cart.clear() 
-            return f"Order placed successfully! Saved to {filename}. \nOrder Summary:\n{summary}"
-        except Exception as e:
-            logger.error(f"Failed to save order: {e}")
-            return "Sorry, there was an error placing your order."
+            filename = f"order_{int(time.time())}.json"
+            try:
+                await asyncio.to_thread(_write_order_sync, filename, order_data)
+
+                summary = self.cart.get_summary()
+                self.cart.clear() 
+                return f"Order placed successfully! Saved to {filename}. \nOrder Summary:\n{summary}"
+            except Exception as e:
+                logger.error(f"Failed to save order: {e}")
+                return "Sorry, there was an error placing your order."
 
 
 def prewarm(proc: JobProcess):
     proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["stt"] = deepgram.STT(
+        model="nova-3",
+        interim_results=True,
+        smart_format=False,
+        endpointing_ms=25,
+    )
+    proc.userdata["llm"] = google.LLM(model="gemini-2.5-flash")
+    proc.userdata["tts"] = deepgram.TTS()
 
 
 async def entrypoint(ctx: JobContext):
@@ -264,9 +292,9 @@ async def entrypoint(ctx: JobContext):
     
     # Initialize AgentSession with plugins
     session = AgentSession(
-        stt=deepgram.STT(model="nova-3"),
-        llm=google.LLM(model="gemini-2.5-flash"),
-        tts=deepgram.TTS(),
+        stt=ctx.proc.userdata["stt"],
+        llm=ctx.proc.userdata["llm"],
+        tts=ctx.proc.userdata["tts"],
         turn_detection=MultilingualModel(),
         vad=ctx.proc.userdata["vad"],
     )
@@ -44,14 +44,22 @@ class GameMasterAgent(Agent):
 
 def prewarm(proc: JobProcess):
     proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["stt"] = deepgram.STT(
+        model="nova-2",
+        interim_results=True,
+        smart_format=False,
+        endpointing_ms=25,
+    )
+    proc.userdata["llm"] = google.LLM(model="gemini-2.5-flash")
+    proc.userdata["tts"] = deepgram.TTS()
 
 async def entrypoint(ctx: JobContext):
     logger.info(f"connecting to room {ctx.room.name}")
     
     session = AgentSession(
-        stt=deepgram.STT(model="nova-2"),
-        llm=google.LLM(model="gemini-2.5-flash"),
-        tts=deepgram.TTS(),
+        stt=ctx.proc.userdata["stt"],
+        llm=ctx.proc.userdata["llm"],
+        tts=ctx.proc.userdata["tts"],
         turn_detection=MultilingualModel(),
         vad=ctx.proc.userdata["vad"],
     )
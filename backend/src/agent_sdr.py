@@ -172,7 +172,12 @@ async def entrypoint(ctx: JobContext):
 
     # Build session
     session = AgentSession(
-        stt=deepgram.STT(model="nova-3"),
+        stt=deepgram.STT(
+            model="nova-3",
+            interim_results=True,
+            smart_format=False,
+            endpointing_ms=25,
+        ),
         llm=google.LLM(model="gemini-2.5-flash"),
         tts=murf.TTS(
             voice="en-US-matthew", # Keep Matthew as the default professional voice
@@ -1,4 +1,5 @@
 import os
+import pathlib
 import sqlite3
 
 # Mimic the logic in agent_day_6.py
@@ -15,26 +16,30 @@ db_path = os.path.join(backend_dir, "fraud_cases.db")
 
 print(f"Calculated DB path: {db_path}")
 
-if os.path.exists(db_path):
-    print("SUCCESS: Database file found.")
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM fraud_cases")
-        rows = cursor.fetchall()
-        print(f"Row count: {len(rows)}")
-        for row in rows:
-            print(f"Row: {row}")
-        conn.close()
-    except Exception as e:
-        print(f"ERROR: Could not read database: {e}")
-else:
-    print("FAILURE: Database file NOT found at calculated path.")
+# Open read-only in one step; a missing file fails here instead of needing
+# a separate exists() check beforehand
+try:
+    conn = sqlite3.connect(f"{pathlib.Path(db_path).as_uri()}?mode=ro", uri=True)
+except sqlite3.OperationalError as e:
+    print(f"FAILURE: Could not open database at calculated path: {e}")
     # List files in backend_dir to see what's there
     print(f"Listing files in {backend_dir}:")
     try:
         print(os.listdir(backend_dir))
     except Exception as e:
         print(f"Could not list directory: {e}")
+else:
+    print("SUCCESS: Database file found.")
+    try:
+        # Count in SQL and stream the rows from the cursor, so memory stays
+        # constant however large the table gets
+        (count,) = conn.execute("SELECT COUNT(*) FROM fraud_cases").fetchone()
+        print(f"Row count: {count}")
+        for row in conn.execute("SELECT * FROM fraud_cases"):
+            print(f"Row: {row}")
+    except Exception as e:
+        print(f"ERROR: Could not read database: {e}")
+    finally:
+        conn.close()
 
 print("--- DEBUG SCRIPT END ---")
@@ -1,6 +1,5 @@
 import unittest
 import sqlite3
-import os
 import sys
 
 # Add src to path so we can import the agent module if needed, 
@@ -12,40 +11,51 @@ import sys
 DB_FILE = "fraud_cases.db"
 
 class TestFraudDB(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Copy the fixture into memory once; every test then runs against RAM and
+        # the file on disk is only ever read. mode=ro fails on a missing database
+        # rather than silently creating an empty one
+        src = sqlite3.connect(f"file:{DB_FILE}?mode=ro", uri=True)
+        # Autocommit mode so the per-test savepoints below control the transaction
+        cls.conn = sqlite3.connect(":memory:", isolation_level=None)
+        try:
+            src.backup(cls.conn)
+        finally:
+            src.close()
+        # The tests filter on userName with the default BINARY collation, which
+        # the fixture's NOCASE idx_fc_username cannot serve
+        cls.conn.execute("CREATE INDEX IF NOT EXISTS idx_test_username ON fraud_cases(userName)")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
     def setUp(self):
-        # Reset DB for test
-        if os.path.exists(DB_FILE):
-            # We assume setup_fraud_db.py has run, but let's just use the existing one
-            pass
-        
+        # Every test runs inside a savepoint that tearDown rolls back, so one
+        # test's writes never leak into the next
+        self.conn.execute("SAVEPOINT t")
+
+    def tearDown(self):
+        self.conn.execute("ROLLBACK TO t")
+        self.conn.execute("RELEASE t")
+
     def test_get_case(self):
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         cursor.execute("SELECT * FROM fraud_cases WHERE userName = 'John'")
         row = cursor.fetchone()
-        conn.close()
         self.assertIsNotNone(row)
         self.assertEqual(row[1], "John")
 
     def test_update_case(self):
-        # Update
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
+        # Update; tearDown's rollback restores the original status
+        cursor = self.conn.cursor()
         cursor.execute("UPDATE fraud_cases SET case_status = 'test_status' WHERE userName = 'John'")
-        conn.commit()
-        
+
         # Verify
         cursor.execute("SELECT case_status FROM fraud_cases WHERE userName = 'John'")
         row = cursor.fetchone()
-        conn.close()
         self.assertEqual(row[0], "test_status")
 
-        # Revert
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("UPDATE fraud_cases SET case_status = 'pending_review' WHERE userName = 'John'")
-        conn.commit()
-        conn.close()
-
 if __name__ == '__main__':
     unittest.main()
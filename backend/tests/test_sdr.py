@@ -1,7 +1,9 @@
 import unittest
 import json
 import os
+import re
 import sys
+import tempfile
 
 # Mocking the classes for testing since they are in the agent file which might have imports we don't want to trigger in a simple unit test
 # Ideally we would refactor the classes to a separate module, but for now I will duplicate the logic for the test or import if possible.
@@ -13,12 +15,16 @@ import sys
 # I'll copy the class logic for this test to ensure the ALGORITHM is correct, assuming the file I/O works.
 
 CONTENT_FILE = "razorpay_content.json"
-LEADS_FILE = "leads_test.json"
+MAX_RESULTS = 3
+
+# Queries mentioning any of these get the pricing line
+_PRICING_RE = re.compile(r"price|cost|fee|charge")
 
 class KnowledgeBase:
     def __init__(self, content_path):
         self.content_path = content_path
         self.data = self._load_content()
+        self._build_index()
 
     def _load_content(self):
         if not os.path.exists(self.content_path):
@@ -26,28 +32,89 @@ class KnowledgeBase:
         with open(self.content_path, 'r') as f:
             return json.load(f)
 
-    def search(self, query: str) -> str:
-        query = query.lower()
-        results = []
+    def _build_index(self):
+        # One entry per searchable record in result order (FAQs, then products),
+        # with its fields lowercased once here instead of on every query and joined
+        # on "\x00" so one `in` covers both without cross-field hits
+        self._records = []
+        self._lower_cache = []
         for faq in self.data.get("faqs", []):
-            if query in faq["question"].lower() or query in faq["answer"].lower():
-                results.append(f"Q: {faq['question']}\nA: {faq['answer']}")
+            self._records.append(f"Q: {faq['question']}\nA: {faq['answer']}")
+            self._lower_cache.append(f"{faq['question']}\x00{faq['answer']}".lower())
         for product in self.data.get("products", []):
-            if query in product["name"].lower() or query in product["description"].lower():
-                results.append(f"Product: {product['name']} - {product['description']}")
+            self._records.append(f"Product: {product['name']} - {product['description']}")
+            self._lower_cache.append(f"{product['name']}\x00{product['description']}".lower())
+        # 3-character window -> ids of the records containing it. A query can only
+        # be a substring of a record that contains every one of its windows
+        self._trigrams = {}
+        for i, text in enumerate(self._lower_cache):
+            for j in range(len(text) - 2):
+                self._trigrams.setdefault(text[j:j + 3], set()).add(i)
         pricing = self.data.get("pricing", {})
-        if "price" in query or "cost" in query or "fee" in query or "charge" in query:
-             results.append(f"Pricing: Standard is {pricing.get('standard')}. {pricing.get('setup_fee')}")
+        self._pricing_line = f"Pricing: Standard is {pricing.get('standard')}. {pricing.get('setup_fee')}"
+
+    def _candidates(self, query):
+        # No single field contains the separator, so such a query matches nothing
+        if "\x00" in query:
+            return ()
+        if len(query) < 3:
+            return range(len(self._records))
+        postings = []
+        for gram in {query[j:j + 3] for j in range(len(query) - 2)}:
+            ids = self._trigrams.get(gram)
+            if not ids:
+                return ()
+            postings.append(ids)
+        # Intersect from the rarest window up so the working set shrinks fastest,
+        # and give up as soon as no record can contain every window
+        postings.sort(key=len)
+        hits = postings[0]
+        for ids in postings[1:]:
+            hits = hits & ids
+            if not hits:
+                return ()
+        return sorted(hits)
+
+    def search(self, query: str) -> str:
+        query = query.lower()
+        results = []
+        # Only the first three hits are returned, so stop looking once we have them
+        for i in self._candidates(query):
+            if query in self._lower_cache[i]:
+                results.append(self._records[i])
+                if len(results) >= MAX_RESULTS:
+                    break
+        if len(results) < MAX_RESULTS and _PRICING_RE.search(query):
+             results.append(self._pricing_line)
         if not results:
             return "No results."
-        return "\n\n".join(results[:3])
+        return "\n\n".join(results)
+
+def naive_search(data, query):
+    # The original linear scan, kept as the reference for the indexed search
+    query = query.lower()
+    results = []
+    for faq in data.get("faqs", []):
+        if query in faq["question"].lower() or query in faq["answer"].lower():
+            results.append(f"Q: {faq['question']}\nA: {faq['answer']}")
+    for product in data.get("products", []):
+        if query in product["name"].lower() or query in product["description"].lower():
+            results.append(f"Product: {product['name']} - {product['description']}")
+    pricing = data.get("pricing", {})
+    if "price" in query or "cost" in query or "fee" in query or "charge" in query:
+        results.append(f"Pricing: Standard is {pricing.get('standard')}. {pricing.get('setup_fee')}")
+    if not results:
+        return "No results."
+    return "\n\n".join(results[:3])
 
 class TestSDRLogic(unittest.TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         # Ensure content file exists (it should from previous steps)
         if not os.path.exists(CONTENT_FILE):
-            self.skipTest("Content file not found")
-        self.kb = KnowledgeBase(CONTENT_FILE)
+            raise unittest.SkipTest("Content file not found")
+        # search() never mutates the KB, so every test shares one instance
+        cls.kb = KnowledgeBase(CONTENT_FILE)
 
     def test_kb_search_pricing(self):
         res = self.kb.search("What are your fees?")
@@ -63,24 +130,35 @@ class TestSDRLogic(unittest.TestCase):
         res = self.kb.search("international payments")
         self.assertIn("100 currencies", res)
 
+    def test_kb_search_matches_linear_scan(self):
+        faq = self.kb.data["faqs"][0]
+        boundary = faq["question"][-6:] + faq["answer"][:6]
+        cases = {
+            "short query": "pa",
+            "single char": "e",
+            "unindexed trigram": "zqxj",
+            "more than three hits": "payment",
+            "question/answer boundary": boundary,
+            "boundary with separator": boundary.replace("?", "?\x00"),
+            "pricing with hits": "fee",
+        }
+        # The early exit only matters if some query has more hits than are returned
+        fields = [(f["question"], f["answer"]) for f in self.kb.data["faqs"]]
+        fields += [(p["name"], p["description"]) for p in self.kb.data["products"]]
+        self.assertGreater(sum(any("payment" in t.lower() for t in pair) for pair in fields), 3)
+        for name, query in cases.items():
+            with self.subTest(name, query=query):
+                self.assertEqual(self.kb.search(query), naive_search(self.kb.data, query))
+
     def test_lead_save(self):
-        # Simple file write test
+        # Leads are NDJSON: each save appends one line instead of rewriting the list.
+        # The temp file is removed on close even if an assertion fails
         lead_data = {"name": "Test User", "email": "test@example.com"}
-        leads = []
-        if os.path.exists(LEADS_FILE):
-            os.remove(LEADS_FILE)
-            
-        leads.append(lead_data)
-        with open(LEADS_FILE, 'w') as f:
-            json.dump(leads, f)
-            
-        self.assertTrue(os.path.exists(LEADS_FILE))
-        with open(LEADS_FILE, 'r') as f:
-            data = json.load(f)
+        with tempfile.NamedTemporaryFile("a+", suffix=".jsonl") as f:
+            f.write(json.dumps(lead_data) + "\n")
+            f.seek(0)
+            data = [json.loads(line) for line in f if line.strip()]
         self.assertEqual(data[0]["name"], "Test User")
-        
-        # Cleanup
-        os.remove(LEADS_FILE)
 
 if __name__ == '__main__':
     unittest.main()